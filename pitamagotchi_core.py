@@ -0,0 +1,596 @@
+#!/usr/bin/python3
+# pitamagotchi_core.py
+
+# _____________________ Shared game logic _____________________
+# Everything that used to be duplicated between tamagotchi.py and
+# tam_sim.py lives here once: the pet, the sprites, drawing, and the main
+# loop. tamagotchi.py runs this directly on the Pi; tam_sim.py installs
+# mock RPi.GPIO / waveshare_epd modules into sys.modules first so the
+# imports below pick them up on a PC.
+
+# _____________________ TICK_TIME was 60 seconds, I thought this was too slow, so updated to 10 and stats adjusted, can be changed if desired _____________________
+
+import os
+import time
+import queue
+import threading
+import functools
+import logging
+from enum import IntEnum
+import RPi.GPIO as GPIO
+
+# Display imports
+from waveshare_epd import epd2in13_V4
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+
+# The sim entry point marks its mock GPIO so the shared loop knows which
+# mode it is running in
+IS_SIMULATION = getattr(GPIO, "_is_mock", False)
+
+# Per-frame chatter goes through the logger at DEBUG, so in normal runs
+# (INFO) the hot loop never formats the string or touches the terminal -
+# console writes were costing more than the draw itself. Run with
+# LOGLEVEL=DEBUG to get the old output back.
+log = logging.getLogger(__name__)
+
+# Display Pin Definitions
+KEY_1_PIN = 5   # Feed
+KEY_2_PIN = 6   # Play
+KEY_3_PIN = 13  # Sleep
+KEY_4_PIN = 19  # Status?
+
+# _____________________ Game Config _____________________
+# We use a shorter tick for simulation to make it easier to test
+TICK_INTERVAL_SEC = 10 if not IS_SIMULATION else 5
+DEBOUNCE_TIME = 0.2     # For buttons
+MESSAGE_HOLD_SEC = 2.0  # How long one-time messages stay on screen
+
+# Deadlines are tracked on time.monotonic_ns(): immune to wall-clock
+# jumps, and integer compares are cheaper than float arithmetic
+TICK_INTERVAL_NS = TICK_INTERVAL_SEC * 1_000_000_000
+MESSAGE_HOLD_NS = int(MESSAGE_HOLD_SEC * 1e9)
+FULL_REFRESH_EVERY = 30 # Partial refreshes between full refreshes (clears ghosting)
+
+# _____________________ Display Dimensions _____________________
+EPD_WIDTH = 122
+EPD_HEIGHT = 250    # May need to be rotated
+
+# _____________________ Asset Paths _____________________
+# Need to have DejaVuSans font
+# On RasPi: /usr/share/fonts/truetype/dejavu/DejaVuSans.ttf
+# Apparently monospace font is better for sprites
+
+@functools.cache
+def _fonts():
+    # Parsing three truetype files costs ~30-100 ms of FreeType work on
+    # the Pi. Loaded on first draw instead of at import, so importing the
+    # module (tests, batch simulation) stays cheap.
+    try:
+        font_path = '/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf'
+        return (ImageFont.truetype(font_path, 24),
+                ImageFont.truetype(font_path, 16),
+                ImageFont.truetype(font_path, 12))
+    except IOError:
+        # Fallback for Windows/Mac
+        try:
+            font_path = 'cour.ttf' # Courier New
+            return (ImageFont.truetype(font_path, 24),
+                    ImageFont.truetype(font_path, 16),
+                    ImageFont.truetype(font_path, 12))
+        except IOError:
+            print("Monospace font not found. Using default.")
+            default = ImageFont.load_default()
+            return (default, default, default)
+
+# _____________________ Pet states _____________________
+class State(IntEnum):
+    # Integer-valued so state compares are single CMPs and sprites can
+    # live in a tuple indexed by state instead of a dict
+    DEAD = 0
+    ASLEEP = 1
+    HUNGRY = 2
+    SAD = 3
+    NEUTRAL = 4
+    HAPPY = 5
+
+# _____________________ ASCII art sprites (Cranberry) _____________________
+# Indexed by State value
+SPRITES_BY_STATE = (
+    # DEAD
+    "\n"
+    " (x_x) \n"
+    " ( (\") \n"
+    " /    \ \n",
+    # ASLEEP
+    "\n"
+    " (z_z) \n"
+    " ( (\") \n"
+    " /    \ \n",
+    # HUNGRY
+    "\n"
+    " (>_<) \n"
+    " ( (\") \n"
+    " /    \ \n",
+    # SAD
+    "\n"
+    " (T_T) \n"
+    " ( (\") \n"
+    " /    \ \n",
+    # NEUTRAL
+    "\n"
+    " (._.) \n"
+    " ( (\") \n"
+    " /    \ \n",
+    # HAPPY
+    "\n"
+    " (^_^) \n"
+    " ( (\") \n"
+    " /    \ \n",
+)
+
+# _____________________ Pet Class _____________________
+# The simulation is fully type-annotated so it can be AOT-compiled with
+# mypyc (mypyc pitamagotchi_core.py) - attribute loads become C struct
+# accesses and the tick arithmetic runs native. Irrelevant at the 10 s
+# game tick, but it makes high-speed replay runs (balance tuning) cheap.
+def _c(x: int) -> int:
+    # Clamp to 0..100 with plain branches - cheaper than max(0, min(100, x))
+    # which costs two builtin calls per stat
+    return 0 if x < 0 else (100 if x > 100 else x)
+
+class PiTamagotchi:
+    hunger: int
+    happiness: int
+    age: int
+    is_asleep: bool
+    state: State
+    next_tick_ns: int
+    _rand_pool: bytearray
+    _rand_idx: int
+
+    def __init__(self) -> None:
+        self.hunger = 50
+        self.happiness = 50
+        self.age = 0
+        self.is_asleep = False
+        self.state = State.NEUTRAL
+        self.next_tick_ns = time.monotonic_ns() + TICK_INTERVAL_NS
+        # Pre-rolled randomness: one urandom call fills the pool, then each
+        # tick just indexes a byte instead of going through random.randint
+        self._rand_pool = bytearray(os.urandom(1024))
+        self._rand_idx = 0
+
+    def _r(self, n: int) -> int:
+        """Return a random int in [0, n) from the pre-rolled byte pool."""
+        if self._rand_idx >= len(self._rand_pool):
+            self._rand_pool[:] = os.urandom(len(self._rand_pool))
+            self._rand_idx = 0
+        b = self._rand_pool[self._rand_idx]
+        self._rand_idx += 1
+        return b % n
+
+    def update_tick(self) -> None:
+        """Called every TICK_INTERVAL to update pet stats."""
+        # Reschedule first so a dead pet doesn't leave a stale deadline
+        self.next_tick_ns = time.monotonic_ns() + TICK_INTERVAL_NS
+
+        if self.state == State.DEAD:
+            return
+
+        # We still age every tick
+        self.age += 1
+
+        if self.is_asleep:
+            # While asleep, stats change very slowly
+            # This runs every 10 sec, so let's make it a 1-in-6 chance
+            if self._r(6) == 0:
+                self.hunger += self._r(2)
+                self.happiness = _c(self.happiness + 1) # Rest
+        else:
+            # While awake, stats decay faster
+            # This runs every 10 sec, so a 1-in-2 chance
+            # This makes it decay ~3x faster
+            if self._r(2) == 0:
+                self.hunger += 1 + self._r(2) # Reduced from (1, 3)
+                self.happiness -= 1 + self._r(2) # Kept the same
+
+        # Clamp values
+        self.hunger = _c(self.hunger)
+        self.happiness = _c(self.happiness)
+
+        self.update_state()
+
+    def update_state(self) -> None:
+        """Update emotional state based off stats"""
+        # Called on every tick and every action, so bind the stats to
+        # locals once and classify in a single expression
+        hunger = self.hunger
+        happy = self.happiness
+        if self.is_asleep:
+            self.state = State.ASLEEP
+        else:
+            self.state = (State.DEAD if hunger > 85 or happy < 15 else
+                          State.HUNGRY if hunger > 70 else
+                          State.SAD if happy < 30 else
+                          State.HAPPY if happy > 80 else
+                          State.NEUTRAL)
+
+    def feed(self) -> bool:
+        if self.is_asleep or self.state == State.DEAD:
+            return False
+        self.hunger = _c(self.hunger - 25)
+        self.happiness = _c(self.happiness + 5)
+        self.update_state()
+        return True
+
+    def play(self) -> bool:
+        if self.is_asleep or self.state == State.DEAD:
+            return False
+        self.happiness = _c(self.happiness + 20)
+        self.hunger = _c(self.hunger + 10)   # Playing should speed up hunger
+        self.update_state()
+        return True
+
+    def toggle_sleep(self) -> bool:
+        if self.state == State.DEAD:
+            return False
+        self.is_asleep = not self.is_asleep
+        self.update_state()
+        return True
+
+    def get_sprite(self) -> str:
+        return SPRITES_BY_STATE[self.state]
+
+# _____________________ Batch simulation _____________________
+def simulate_batch(n_pets, n_ticks, seed=None):
+    """Simulate many awake, unattended pets at once for balance tuning.
+
+    Tweaking the decay rates needs thousands of ticks to see survival
+    curves, which the scalar PiTamagotchi loop is too slow for. This runs
+    all pets in numpy arrays - one vectorized roll/clamp per tick for the
+    whole population instead of per-pet Python calls.
+
+    Returns (histogram, ages): a {state name: count} dict of final states
+    and an array of how many ticks each pet survived.
+    """
+    rng = np.random.default_rng(seed)
+    hunger = np.full(n_pets, 50, dtype=np.int16)
+    happiness = np.full(n_pets, 50, dtype=np.int16)
+    age = np.zeros(n_pets, dtype=np.int32)
+    alive = np.ones(n_pets, dtype=bool)
+
+    for _ in range(n_ticks):
+        age[alive] += 1
+        # Awake decay, same odds as update_tick: 1-in-2 chance of
+        # hunger +1..2 and happiness -1..2
+        roll = alive & (rng.integers(0, 2, size=n_pets) == 0)
+        hunger += roll * rng.integers(1, 3, size=n_pets)
+        happiness -= roll * rng.integers(1, 3, size=n_pets)
+        np.clip(hunger, 0, 100, out=hunger)
+        np.clip(happiness, 0, 100, out=happiness)
+        alive &= ~((hunger > 85) | (happiness < 15))
+
+    # Classify final states the same way update_state does
+    states = np.select(
+        [~alive, hunger > 70, happiness < 30, happiness > 80],
+        [int(State.DEAD), int(State.HUNGRY), int(State.SAD), int(State.HAPPY)],
+        default=int(State.NEUTRAL),
+    )
+    counts = np.bincount(states, minlength=len(State))
+    histogram = {state.name: int(counts[state]) for state in State}
+    return histogram, age
+
+# _____________________ GPIO setup _____________________
+# Button events land in this queue - from GPIO edge-detect callbacks on
+# hardware, or from the keyboard reader in sim mode. The main loop blocks
+# on it instead of polling pins every 50 ms.
+_input_q: "queue.Queue[str]" = queue.Queue()
+
+_SIM_KEYMAP = {'1': "feed", '2': "play", '3': "sleep"}
+
+def setup_buttons():
+    GPIO.setmode(GPIO.BCM)
+    # Setup buttons as inputs (pull-up), button press connects pin to GND
+    GPIO.setup(KEY_1_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.setup(KEY_2_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.setup(KEY_3_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.setup(KEY_4_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+    # Edge-triggered interrupts instead of polling: sub-ms latency and no
+    # CPU wakeups while idle. bouncetime handles the debounce for us.
+    # (No-op in sim mode - the keyboard reader feeds the queue directly.)
+    bounce_ms = int(DEBOUNCE_TIME * 1000)
+    GPIO.add_event_detect(KEY_1_PIN, GPIO.FALLING,
+                          callback=lambda ch: _input_q.put("feed"),
+                          bouncetime=bounce_ms)
+    GPIO.add_event_detect(KEY_2_PIN, GPIO.FALLING,
+                          callback=lambda ch: _input_q.put("play"),
+                          bouncetime=bounce_ms)
+    GPIO.add_event_detect(KEY_3_PIN, GPIO.FALLING,
+                          callback=lambda ch: _input_q.put("sleep"),
+                          bouncetime=bounce_ms)
+
+# _____________________ Pre-rendered bitmaps _____________________
+# Rasterize each sprite (and the static button labels) through FreeType
+# once, on first draw. Redraws then just paste the cached bitmap instead
+# of laying out glyphs every frame.
+def _render_text(text, font, size):
+    img = Image.new('1', size, 255)
+    ImageDraw.Draw(img).text((0, 0), text, font=font, fill=0)
+    return img
+
+@functools.cache
+def _static_bitmaps():
+    # Deferred with the fonts: nothing is rasterized until the first
+    # frame is actually drawn
+    font_large, _, font_small = _fonts()
+    sprites = tuple(_render_text(text, font_large, (120, 110))
+                    for text in SPRITES_BY_STATE)
+    labels = (
+        ((160, 20), _render_text("Feed (1)", font_small, (80, 16))),
+        ((160, 40), _render_text("Play (2)", font_small, (80, 16))),
+        ((160, 60), _render_text("Sleep (3)", font_small, (80, 16))),
+    )
+    return sprites, labels
+
+# Reusable packed framebuffer. The driver's getbuffer() allocates a fresh
+# buffer every frame; packing into this bytearray instead keeps that
+# allocation out of the per-frame path. Portrait rows pad to whole bytes.
+_pkt_buf = bytearray((EPD_WIDTH + 7) // 8 * EPD_HEIGHT)
+
+def _getbuffer_into(image, out):
+    # Same layout the Waveshare driver's getbuffer() produces for a
+    # landscape image (rotate to portrait, 1-bit packed rows), but done
+    # as vectorized numpy ops straight off the shared framebuffer
+    out[:] = np.packbits(np.rot90(_fb) >= 128, axis=1).tobytes()
+    return out
+
+# Size of the cached stats sub-image. 152 px fits "Hunger: 100/100" in the
+# medium mono font and is byte-aligned for 1-bit packing.
+_STATS_SIZE = (152, 60)
+
+@functools.lru_cache(maxsize=128)
+def _render_stats_block(hunger, happy, age):
+    """Rasterize the three stat lines once per distinct (hunger, happy, age).
+
+    Stats only move a point or two per tick, so this hits the cache far
+    more often than it runs FreeType. Stored as packed bytes so the cache
+    entries stay small.
+    """
+    _, font_medium, _ = _fonts()
+    img = Image.new('1', _STATS_SIZE, 255)
+    d = ImageDraw.Draw(img)
+    d.text((0, 0), f"Hunger: {hunger}/100", font=font_medium, fill=0)
+    d.text((0, 20), f"Happy:  {happy}/100", font=font_medium, fill=0)
+    d.text((0, 40), f"Age: {age}", font=font_medium, fill=0)
+    return img.tobytes()
+
+# _____________________ Drawing function _____________________
+# One persistent frame buffer, reused every redraw. The pixels live in a
+# numpy array wrapped by a PIL image: clears are SIMD fills on the array,
+# PIL draws write straight through into it, and the 1-bit packing for the
+# panel is a single vectorized packbits over the same memory.
+_fb = np.full((EPD_WIDTH, EPD_HEIGHT), 255, dtype=np.uint8) # 255 = White
+_FRAME_IMAGE = Image.frombuffer('L', (EPD_HEIGHT, EPD_WIDTH), _fb, 'raw', 'L', 0, 1)
+_FRAME_IMAGE.readonly = 0  # frombuffer marks shared memory read-only; we own it
+_FRAME_DRAW = ImageDraw.Draw(_FRAME_IMAGE)
+
+def draw_display(pet, message=""):
+    """Render the current game state and return the frame image.
+
+    The caller decides whether to actually push it to the display
+    (so identical frames can be skipped - e-ink refreshes are slow).
+    """
+
+    font_large, font_medium, _ = _fonts()
+    sprite_bitmaps, label_bitmaps = _static_bitmaps()
+
+    # Reuse the persistent image, wiped to white each frame
+    image = _FRAME_IMAGE
+    draw = _FRAME_DRAW
+    _fb[:] = 255
+
+    # Paste the pre-rendered Pet Sprite (no FreeType work per frame)
+    image.paste(sprite_bitmaps[pet.state], (30, 20))
+
+    # Draw Stats (cached - re-rasterized only when a stat value changes)
+    if pet.state != State.DEAD:
+        stats = _render_stats_block(pet.hunger, pet.happiness, pet.age)
+        image.paste(Image.frombytes('1', _STATS_SIZE, stats), (10, 130))
+    else:
+        # Game Over
+        draw.text((30, 140), "GAME OVER", font=font_large, fill=0)
+
+    # Paste the static Button Labels
+    for pos, bitmap in label_bitmaps:
+        image.paste(bitmap, pos)
+
+    # Draw the one-time message
+    if message:
+        draw.text((10, 200), message, font=font_medium, fill=0)
+
+    return image
+
+# _____________________It's (main) loopin' time _____________________
+def main():
+    epd = None
+    try:
+        # Init
+        logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))
+        print("Initializing PiTamagotchi...")
+        epd = epd2in13_V4.EPD()
+        epd.init()
+        epd.Clear(0xFF)     # Clears screen to white
+
+        setup_buttons()
+        pet = PiTamagotchi()
+
+        if IS_SIMULATION:
+            GPIO._setup_terminal()
+
+        message = "Hello Traveler!"
+        message_expires_ns = time.monotonic_ns() + MESSAGE_HOLD_NS
+        needs_draw = True
+        last_frame_hash = None  # Skip refreshes when the frame didn't change
+        partial_count = 0
+
+        # Single-slot handoff to the display worker: if a new frame
+        # arrives while one is still waiting, the old one is dropped -
+        # only the latest frame matters
+        draw_q = queue.Queue(maxsize=1)
+
+        def display_worker():
+            # epd.display* blocks for up to a couple of seconds on real
+            # hardware (and the image window can block in sim); running it
+            # here keeps the main loop responsive to buttons and ticks
+            while True:
+                buf, full = draw_q.get()
+                if full:
+                    epd.displayPartBaseImage(buf)
+                else:
+                    epd.displayPartial(buf)
+
+        threading.Thread(target=display_worker, daemon=True).start()
+
+        def push_frame(image):
+            # Queue a frame for the worker using the driver's fast partial
+            # refresh (no global flash). Every FULL_REFRESH_EVERY pushes we
+            # do a full refresh instead, which also resets the partial base
+            # image, to clear the ghosting partial updates leave behind.
+            nonlocal last_frame_hash, partial_count
+            frame_hash = hash(image.tobytes())
+            if frame_hash == last_frame_hash:
+                return
+            # Copy for the worker - the pooled image and buffer get
+            # reused for the next render
+            if IS_SIMULATION:
+                buf = image.copy()
+            else:
+                buf = bytes(_getbuffer_into(image, _pkt_buf))
+            frame = (buf, partial_count == 0)
+            try:
+                draw_q.put_nowait(frame)
+            except queue.Full:
+                try:
+                    dropped = draw_q.get_nowait()
+                    # Carry the dropped frame's full-refresh flag over so
+                    # the periodic ghost-clearing refresh is never lost
+                    frame = (buf, frame[1] or dropped[1])
+                except queue.Empty:
+                    pass
+                draw_q.put_nowait(frame)
+            partial_count = (partial_count + 1) % FULL_REFRESH_EVERY
+            last_frame_hash = frame_hash
+
+        # Game Loop
+        while True:
+            now_ns = time.monotonic_ns()
+            action_taken = False
+
+            # 0: Expire the one-time message. This replaces the old
+            # blocking sleep(2) + second refresh after every action - the
+            # loop stays responsive and redraws when the message is due out.
+            if message and now_ns > message_expires_ns:
+                message = ""
+                needs_draw = True
+
+            # 1: Get Simulated Input (if in sim mode)
+            if IS_SIMULATION:
+                # Wait for a keypress, but only until the next tick or
+                # message expiry is due (and not at all if a draw is
+                # pending) - ticks keep firing while the user is idle
+                if needs_draw:
+                    timeout = 0.0
+                else:
+                    deadline_ns = pet.next_tick_ns
+                    if message:
+                        deadline_ns = min(deadline_ns, message_expires_ns)
+                    timeout = max(0.0, (deadline_ns - now_ns) / 1e9)
+                GPIO._get_sim_input(timeout)
+                key = GPIO._pressed_key
+                GPIO._pressed_key = None # Clear key
+                if key == 't':
+                    # Special sim command: force a game tick
+                    # (update_tick reschedules the deadline itself)
+                    log.info("[SIM] Forcing game tick...")
+                    pet.update_tick()
+                    message = "Tick!"
+                    message_expires_ns = time.monotonic_ns() + MESSAGE_HOLD_NS
+                    needs_draw = True
+                elif key in _SIM_KEYMAP:
+                    # Route keyboard "buttons" through the same event
+                    # queue the GPIO callbacks use
+                    _input_q.put(_SIM_KEYMAP[key])
+
+            # 2: Check for game tick (update_tick reschedules the deadline)
+            if time.monotonic_ns() >= pet.next_tick_ns:
+                pet.update_tick()
+                if pet.state != State.ASLEEP:
+                    message = "Time passes..."
+                    message_expires_ns = time.monotonic_ns() + MESSAGE_HOLD_NS
+                needs_draw = True
+
+            # 3: Wait for a button event until the next tick (or message
+            # expiry) is due. The blocking queue wait replaces the old
+            # 50 ms polling sleep, so the thread is fully idle until a
+            # GPIO callback fires or a deadline passes. In sim mode stdin
+            # already paces the loop, so don't block here; same when a
+            # draw is pending.
+            if IS_SIMULATION or needs_draw:
+                timeout = 0.0
+            else:
+                deadline_ns = pet.next_tick_ns
+                if message:
+                    deadline_ns = min(deadline_ns, message_expires_ns)
+                timeout = max(0.0, (deadline_ns - time.monotonic_ns()) / 1e9)
+            try:
+                event = _input_q.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+
+            if event == "feed":
+                if pet.feed():
+                    message = "Yum!"
+                    action_taken = True
+            elif event == "play":
+                if pet.play():
+                    message = "Whee!"
+                    action_taken = True
+            elif event == "sleep":
+                if pet.toggle_sleep():
+                    message = "Zzz..." if pet.is_asleep else "I'm awake!"
+                    action_taken = True
+
+            if action_taken:
+                needs_draw = True
+                message_expires_ns = time.monotonic_ns() + MESSAGE_HOLD_NS
+
+            # 4: Update Display (may be needed)
+            if needs_draw:
+                if pet.state == State.DEAD and not action_taken:
+                    # If dead, don't keep redrawing
+                    pass
+                else:
+                    # %-style args: the string is only built if DEBUG is on
+                    log.debug("Drawing... (State: %s, Msg: %s)", pet.state.name, message)
+                    push_frame(draw_display(pet, message))
+
+                needs_draw = False
+
+    except IOError as e:
+        print(e)
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        # --- Cleanup ---
+        if epd:
+            print("Clearing display and sleeping...")
+            if not IS_SIMULATION:
+                epd.Clear(0xFF)
+                epd.sleep()
+        GPIO.cleanup()
+        print("Goodbye!")
+
+if __name__ == '__main__':
+    main()